@@ -0,0 +1,19 @@
+"""
+Generador de carga local para la API de conversión ASCII.
+
+Uso:
+    cd backend
+    python -m loadtest loadtest/scenarios/baseline.json loadtest/scenarios/workers_4.json
+"""
+
+from .scenario import Scenario, RequestSpec, ServerSpec
+from .runner import run_scenario, format_report, format_comparison
+
+__all__ = [
+    "Scenario",
+    "RequestSpec",
+    "ServerSpec",
+    "run_scenario",
+    "format_report",
+    "format_comparison",
+]
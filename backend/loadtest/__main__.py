@@ -0,0 +1,43 @@
+"""
+CLI del generador de carga.
+
+    python -m loadtest ESCENARIO.json [ESCENARIO.json ...] [--url URL] [--output DIR]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from .runner import format_comparison, format_report, run_scenario
+from .scenario import Scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga local de la API ASCII")
+    parser.add_argument("scenarios", nargs="+", help="Archivos JSON de escenario")
+    parser.add_argument("--url", help="Usar un servidor ya levantado en lugar del definido en el escenario")
+    parser.add_argument("--output", help="Directorio donde guardar los reportes JSON")
+    args = parser.parse_args()
+
+    scenarios = [Scenario.from_file(path) for path in args.scenarios]
+    output_dir = Path(args.output) if args.output else None
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    reports = []
+    for scenario in scenarios:
+        report = run_scenario(scenario, base_url=args.url)
+        reports.append(report)
+        print(format_report(report))
+        print()
+
+        if output_dir:
+            with open(output_dir / f"{scenario.name}.json", "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if len(reports) > 1:
+        print(format_comparison(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+"""
+Ejecución de escenarios de carga y cálculo de métricas.
+
+Las peticiones se programan con tasa de llegada fija: la petición i sale en
+t0 + i / rate, sin esperar a que terminen las anteriores. La latencia se mide
+desde el instante programado, así que la espera en la cola del cliente cuenta
+como latencia y un servidor saturado no queda oculto.
+"""
+
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import Settings
+
+from .scenario import Scenario, ServerSpec
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CONTENT_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "BMP": "image/bmp",
+    "GIF": "image/gif",
+}
+
+
+# ---------------------------------------------------------------------------
+# Generación de cargas útiles
+# ---------------------------------------------------------------------------
+
+def generate_image(size: Tuple[int, int], image_format: str, seed: int) -> bytes:
+    """
+    Genera una imagen sintética (gradiente + ruido) determinista.
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = (x + y) / 2
+    noise = rng.normal(0, 40, (height, width, 3))
+    pixels = np.clip(base[:, :, None] + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def encode_multipart(fields: Dict[str, str], file_bytes: bytes, content_type: str) -> Tuple[bytes, str]:
+    """
+    Codifica un formulario multipart con un único archivo `image`.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+
+    parts.append(
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="image"; filename="load"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n".encode()
+    )
+    parts.append(file_bytes)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def build_requests(scenario: Scenario) -> Dict[str, Tuple[str, bytes, str]]:
+    """
+    Prepara una vez el cuerpo de cada tipo de petición de la mezcla.
+
+    Returns:
+        Dict etiqueta -> (ruta, cuerpo, content-type)
+    """
+    images: Dict[Tuple[Tuple[int, int], str], bytes] = {}
+    prepared = {}
+
+    for spec in scenario.mix:
+        key = (tuple(spec.image_size), spec.image_format)
+        if key not in images:
+            images[key] = generate_image(spec.image_size, spec.image_format, scenario.seed)
+
+        if spec.endpoint == "convert":
+            path = "/api/convert"
+            fields = {
+                "max_width": str(spec.max_width),
+                "include_metadata": "true" if spec.include_metadata else "false",
+            }
+        else:
+            path = "/api/info"
+            fields = {}
+
+        body, content_type = encode_multipart(fields, images[key], CONTENT_TYPES[spec.image_format])
+        prepared[spec.label] = (path, body, content_type)
+
+    return prepared
+
+
+# ---------------------------------------------------------------------------
+# Servidor bajo prueba
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env_value(value) -> str:
+    """Serializa un valor de Settings como lo espera pydantic-settings."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _wait_until_ready(
+        base_url: str,
+        timeout: float = 30.0,
+        process: Optional[subprocess.Popen] = None
+) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {base_url} tras {timeout:.0f}s")
+
+
+@contextmanager
+def _spawned_server(spec: ServerSpec) -> Iterator[Tuple[str, Optional[int]]]:
+    port = _free_port()
+    # Ningún campo de Settings se hereda del shell: sólo cuentan el escenario y .env
+    fields = {name.lower() for name in Settings.model_fields}
+    env = {key: value for key, value in os.environ.items() if key.lower() not in fields}
+    env.update({key.upper(): _env_value(value) for key, value in spec.settings.items()})
+
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(spec.workers),
+            "--log-level", "warning",
+        ],
+        cwd=str(BACKEND_DIR),
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        _wait_until_ready(base_url, process=process)
+        yield base_url, process.pid
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@contextmanager
+def _inprocess_server(spec: ServerSpec) -> Iterator[Tuple[str, Optional[int]]]:
+    import uvicorn
+    from app.core.config import settings
+    from app.main import app
+
+    # Las rutas leen el objeto `settings` compartido en cada petición;
+    # los valores ya vienen convertidos por ServerSpec.from_dict
+    previous = {key: getattr(settings, key) for key in spec.settings}
+    for key, value in spec.settings.items():
+        setattr(settings, key, value)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        _wait_until_ready(base_url)
+        yield base_url, os.getpid()
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        for key, value in previous.items():
+            setattr(settings, key, value)
+
+
+@contextmanager
+def _external_server(spec: ServerSpec) -> Iterator[Tuple[str, Optional[int]]]:
+    base_url = spec.url.rstrip("/")
+    _wait_until_ready(base_url)
+    yield base_url, spec.pid
+
+
+def server_for(spec: ServerSpec):
+    """Devuelve el context manager que levanta (o localiza) el servidor."""
+    if spec.mode == "spawn":
+        return _spawned_server(spec)
+    if spec.mode == "inprocess":
+        return _inprocess_server(spec)
+    return _external_server(spec)
+
+
+# ---------------------------------------------------------------------------
+# Memoria del servidor
+# ---------------------------------------------------------------------------
+
+def _read_rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return 0
+
+
+def _child_pids(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii") as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    return children
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """
+    RSS total del proceso y sus descendientes (workers de uvicorn), en MB.
+    Devuelve None si /proc no está disponible.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    root = _read_rss_kb(pid)
+    if root is None:
+        return None
+
+    total = root
+    pending = _child_pids(pid)
+    while pending:
+        child = pending.pop()
+        total += _read_rss_kb(child) or 0
+        pending.extend(_child_pids(child))
+
+    return total / 1024
+
+
+class RSSSampler(threading.Thread):
+    """
+    Muestrea periódicamente el RSS del servidor durante la ejecución.
+    """
+
+    def __init__(self, pid: Optional[int], interval: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Tuple[float, float]] = []
+        self._stop_event = threading.Event()
+        self._start = time.monotonic()
+
+    def run(self):
+        if self.pid is None:
+            return
+        while not self._stop_event.is_set():
+            rss = process_tree_rss_mb(self.pid)
+            if rss is None:
+                return
+            self.samples.append((round(time.monotonic() - self._start, 3), round(rss, 1)))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def _send(base_url: str, path: str, body: bytes, content_type: str, timeout: float) -> Tuple[int, Optional[str]]:
+    request = urllib.request.Request(
+        f"{base_url}{path}",
+        data=body,
+        headers={"Content-Type": content_type},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, None
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, f"HTTP {e.code}"
+    except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+        reason = getattr(e, "reason", e)
+        return 0, type(reason).__name__
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Percentil con interpolación lineal sobre valores ya ordenados.
+    """
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+
+    rank = (len(values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def _latency_stats(latencies: List[float]) -> dict:
+    """Percentiles, media y máximo de una lista de latencias ordenada."""
+    def _round(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "p50": _round(percentile(latencies, 50)),
+        "p95": _round(percentile(latencies, 95)),
+        "p99": _round(percentile(latencies, 99)),
+        "mean": _round(sum(latencies) / len(latencies)) if latencies else None,
+        "max": _round(latencies[-1]) if latencies else None,
+    }
+
+
+def summarize(records: List[dict], wall_time: float) -> dict:
+    """
+    Agrega latencias (ms), tasa de error y throughput de un grupo de peticiones.
+
+    `latency_ms` incluye todas las peticiones, también las fallidas y las que
+    agotaron el timeout, para que la cola de una configuración saturada no
+    desaparezca de p95/p99. `latency_ok_ms` sólo cubre las exitosas.
+    """
+    all_latencies = sorted(r["latency_ms"] for r in records)
+    latencies = sorted(r["latency_ms"] for r in records if r["error"] is None)
+    errors: Dict[str, int] = {}
+    for r in records:
+        if r["error"] is not None:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    total = len(records)
+    failed = total - len(latencies)
+
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": failed,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "error_kinds": errors,
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0,
+        "latency_ms": _latency_stats(all_latencies),
+        "latency_ok_ms": _latency_stats(latencies),
+    }
+
+
+def run_scenario(scenario: Scenario, base_url: Optional[str] = None) -> dict:
+    """
+    Ejecuta un escenario completo y devuelve el reporte como dict.
+
+    Args:
+        scenario: Escenario a ejecutar
+        base_url: Si se indica, ignora `scenario.server` y apunta a esa URL;
+            la configuración del servidor se reporta como desconocida
+
+    Returns:
+        Reporte con métricas globales, por tipo de petición y RSS en el tiempo
+    """
+    server_spec = scenario.server
+    if base_url is not None:
+        if server_spec.mode != "url" and server_spec.settings:
+            warnings.warn(
+                f"--url ignora los settings del escenario '{scenario.name}'; "
+                "el servidor externo usa su propia configuración"
+            )
+        server_spec = ServerSpec(mode="url", url=base_url, pid=server_spec.pid)
+
+    prepared = build_requests(scenario)
+    rng = random.Random(scenario.seed)
+    labels = [spec.label for spec in scenario.mix]
+    weights = [spec.weight for spec in scenario.mix]
+    total_requests = max(1, int(scenario.rate * scenario.duration))
+    schedule = rng.choices(labels, weights=weights, k=total_requests)
+
+    records: List[dict] = []
+    records_lock = threading.Lock()
+
+    def _task(url: str, label: str, scheduled: float, start: float):
+        path, body, content_type = prepared[label]
+        try:
+            status, error = _send(url, path, body, content_type, scenario.timeout)
+        except Exception as e:
+            # IncompleteRead, BadStatusLine, OSError durante la lectura, etc.
+            status, error = 0, type(e).__name__
+        latency = (time.monotonic() - scheduled) * 1000
+        with records_lock:
+            records.append({
+                "label": label,
+                "offset_s": round(scheduled - start, 3),
+                "status": status,
+                "latency_ms": latency,
+                "error": error,
+            })
+
+    with server_for(server_spec) as (url, pid):
+        sampler = RSSSampler(pid, scenario.rss_interval)
+        sampler.start()
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=scenario.concurrency) as executor:
+            for i, label in enumerate(schedule):
+                scheduled = start + i / scenario.rate
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(_task, url, label, scheduled, start)
+        wall_time = time.monotonic() - start
+
+        sampler.stop()
+
+    if len(records) != total_requests:
+        raise RuntimeError(
+            f"Se registraron {len(records)} de {total_requests} peticiones programadas"
+        )
+
+    by_label = {
+        label: summarize([r for r in records if r["label"] == label], wall_time)
+        for label in labels
+    }
+    rss_values = [rss for _, rss in sampler.samples]
+    # Con un servidor externo no se conoce su configuración real
+    external = server_spec.mode == "url"
+
+    return {
+        "scenario": scenario.name,
+        "target_rate": scenario.rate,
+        "duration_s": scenario.duration,
+        "wall_time_s": round(wall_time, 2),
+        "client_concurrency": scenario.concurrency,
+        "server": {
+            "mode": server_spec.mode,
+            "workers": None if external else server_spec.workers,
+            "settings": None if external else server_spec.settings,
+        },
+        "overall": summarize(records, wall_time),
+        "by_request": by_label,
+        "rss_mb": {
+            "start": rss_values[0] if rss_values else None,
+            "end": rss_values[-1] if rss_values else None,
+            "peak": max(rss_values) if rss_values else None,
+            "samples": sampler.samples,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reportes
+# ---------------------------------------------------------------------------
+
+def _fmt(value, suffix: str = "") -> str:
+    return "-" if value is None else f"{value}{suffix}"
+
+
+def format_report(report: dict) -> str:
+    """Resumen legible de un reporte."""
+    overall = report["overall"]
+    lat = overall["latency_ms"]
+    lat_ok = overall["latency_ok_ms"]
+    rss = report["rss_mb"]
+    server = report["server"]
+
+    lines = [
+        f"== {report['scenario']} ==",
+        f"servidor: {server['mode']}, workers={_fmt(server['workers'])}, "
+        f"settings={_fmt(server['settings'])}",
+        f"tasa objetivo: {report['target_rate']} rps, duración: {report['wall_time_s']}s, "
+        f"concurrencia cliente: {report['client_concurrency']}",
+        f"peticiones: {overall['requests']}, ok: {overall['ok']}, "
+        f"errores: {overall['errors']} ({overall['error_rate']:.2%})",
+        f"throughput: {overall['throughput_rps']} rps",
+        f"latencia ms (todas): p50={_fmt(lat['p50'])} p95={_fmt(lat['p95'])} "
+        f"p99={_fmt(lat['p99'])} max={_fmt(lat['max'])}",
+        f"latencia ms (ok):    p50={_fmt(lat_ok['p50'])} p95={_fmt(lat_ok['p95'])} "
+        f"p99={_fmt(lat_ok['p99'])} max={_fmt(lat_ok['max'])}",
+        f"RSS MB: inicio={_fmt(rss['start'])} fin={_fmt(rss['end'])} pico={_fmt(rss['peak'])}",
+    ]
+
+    if overall["error_kinds"]:
+        lines.append(f"tipos de error: {overall['error_kinds']}")
+
+    lines.append("por petición:")
+    for label, stats in report["by_request"].items():
+        lat = stats["latency_ms"]
+        lines.append(
+            f"  {label:<40} n={stats['requests']:<6} err={stats['error_rate']:<7.2%} "
+            f"p50={_fmt(lat['p50'])} p95={_fmt(lat['p95'])} p99={_fmt(lat['p99'])}"
+        )
+
+    return "\n".join(lines)
+
+
+def format_comparison(reports: List[dict]) -> str:
+    """Tabla comparativa de varios escenarios."""
+    header = f"{'escenario':<24} {'rps':>8} {'err %':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'RSS pico':>9}"
+    lines = [header, "-" * len(header)]
+
+    for report in reports:
+        overall = report["overall"]
+        lat = overall["latency_ms"]
+        lines.append(
+            f"{report['scenario']:<24} {overall['throughput_rps']:>8} "
+            f"{overall['error_rate'] * 100:>7.2f} {_fmt(lat['p50']):>9} "
+            f"{_fmt(lat['p95']):>9} {_fmt(lat['p99']):>9} {_fmt(report['rss_mb']['peak']):>9}"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,196 @@
+"""
+Escenarios de carga guardados como archivos JSON.
+
+Un escenario fija la tasa de llegada, la duración, la mezcla de peticiones
+y los valores de `Settings` con los que se levanta el servidor, de modo que
+dos ejecuciones del mismo archivo sean comparables.
+
+En modo `spawn` el servidor no hereda ningún campo de `Settings` del entorno
+del shell y `backend/.env` sólo aporta los campos que el escenario no fija;
+conviene fijar en `settings` todo lo que influya en la comparación.
+
+Cada escenario de `scenarios/` cambia una sola variable respecto a
+`baseline.json`. `enable_cache` y `cache_ttl` todavía no se leen en `app/`,
+así que variarlos no cambia el comportamiento del servidor.
+"""
+
+import json
+import math
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+ENDPOINTS = ("convert", "info")
+SERVER_MODES = ("spawn", "inprocess", "url")
+IMAGE_FORMATS = ("PNG", "JPEG", "WEBP", "BMP", "GIF")
+
+
+@dataclass
+class RequestSpec:
+    """
+    Tipo de petición dentro de la mezcla del escenario.
+    """
+    endpoint: str = "convert"
+    weight: float = 1.0
+    max_width: int = 100
+    include_metadata: bool = False
+    image_size: Tuple[int, int] = (640, 480)
+    image_format: str = "PNG"
+
+    @property
+    def label(self) -> str:
+        """Etiqueta corta usada para agrupar resultados."""
+        width, height = self.image_size
+        if self.endpoint == "info":
+            return f"info {width}x{height} {self.image_format}"
+
+        label = f"convert w={self.max_width} {width}x{height} {self.image_format}"
+        if self.include_metadata:
+            label += " +meta"
+        return label
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestSpec":
+        include_metadata = data.get("include_metadata", False)
+        if not isinstance(include_metadata, bool):
+            raise ValueError(f"include_metadata debe ser true o false: {include_metadata!r}")
+
+        image_size = data.get("image_size", [640, 480])
+        if (
+            not isinstance(image_size, (list, tuple))
+            or len(image_size) != 2
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in image_size)
+            or min(image_size) <= 0
+        ):
+            raise ValueError(f"Tamaño de imagen inválido: {image_size!r}")
+
+        spec = cls(
+            endpoint=data.get("endpoint", "convert"),
+            weight=float(data.get("weight", 1.0)),
+            max_width=int(data.get("max_width", 100)),
+            include_metadata=include_metadata,
+            image_size=tuple(image_size),
+            image_format=str(data.get("image_format", "PNG")).upper(),
+        )
+
+        if spec.endpoint not in ENDPOINTS:
+            raise ValueError(f"Endpoint desconocido: {spec.endpoint}")
+        if spec.weight <= 0:
+            raise ValueError("El peso de cada petición debe ser positivo")
+        if spec.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Formato de imagen no soportado: {spec.image_format}")
+
+        return spec
+
+
+@dataclass
+class ServerSpec:
+    """
+    Cómo se obtiene el servidor bajo prueba.
+
+    - spawn: lanza uvicorn en localhost como subproceso
+    - inprocess: ejecuta uvicorn en un hilo del propio generador
+      (un solo worker; el RSS medido incluye al cliente)
+    - url: usa un servidor ya levantado (sin medición de RSS salvo `pid`)
+    """
+    mode: str = "spawn"
+    url: Optional[str] = None
+    pid: Optional[int] = None
+    workers: int = 1
+    settings: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ServerSpec":
+        spec = cls(
+            mode=data.get("mode", "spawn"),
+            url=data.get("url"),
+            pid=int(data["pid"]) if data.get("pid") is not None else None,
+            workers=int(data.get("workers", 1)),
+            settings=dict(data.get("settings", {})),
+        )
+
+        if spec.mode not in SERVER_MODES:
+            raise ValueError(f"Modo de servidor desconocido: {spec.mode}")
+        if spec.mode == "url" and not spec.url:
+            raise ValueError("El modo 'url' requiere el campo 'url'")
+        if spec.workers < 1:
+            raise ValueError("Se requiere al menos un worker")
+        if spec.mode == "inprocess" and spec.workers > 1:
+            raise ValueError("El modo 'inprocess' sólo admite un worker")
+
+        unknown = sorted(set(spec.settings) - set(Settings.model_fields))
+        if unknown:
+            raise ValueError(f"Campos de Settings desconocidos: {', '.join(unknown)}")
+
+        # Misma coerción de tipos que aplica pydantic-settings al leer el entorno,
+        # para que el modo 'inprocess' reciba valores idénticos a 'spawn'
+        try:
+            validated = Settings.model_validate(spec.settings)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            raise ValueError(f"Settings inválidos: {errors}")
+        spec.settings = {key: getattr(validated, key) for key in spec.settings}
+
+        if spec.mode == "url" and spec.settings:
+            warnings.warn("El modo 'url' ignora los settings; el servidor externo usa su propia configuración")
+
+        return spec
+
+
+@dataclass
+class Scenario:
+    """
+    Escenario de carga con tasa de llegada fija (bucle abierto).
+    """
+    name: str
+    rate: float
+    duration: float
+    concurrency: int = 16
+    timeout: float = 30.0
+    seed: int = 0
+    rss_interval: float = 0.5
+    server: ServerSpec = field(default_factory=ServerSpec)
+    mix: List[RequestSpec] = field(default_factory=lambda: [RequestSpec()])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        if "name" not in data:
+            raise ValueError("El escenario requiere un nombre")
+
+        scenario = cls(
+            name=str(data["name"]),
+            rate=float(data.get("rate", 10.0)),
+            duration=float(data.get("duration", 30.0)),
+            concurrency=int(data.get("concurrency", 16)),
+            timeout=float(data.get("timeout", 30.0)),
+            seed=int(data.get("seed", 0)),
+            rss_interval=float(data.get("rss_interval", 0.5)),
+            server=ServerSpec.from_dict(data.get("server", {})),
+            mix=[RequestSpec.from_dict(item) for item in data.get("mix", [{}])],
+        )
+
+        for name in ("rate", "duration", "timeout", "rss_interval"):
+            value = getattr(scenario, name)
+            if not math.isfinite(value) or value <= 0:
+                raise ValueError(f"{name} debe ser un número positivo y finito: {value}")
+        if scenario.concurrency < 1:
+            raise ValueError("La concurrencia del cliente debe ser al menos 1")
+        if not scenario.mix:
+            raise ValueError("La mezcla de peticiones no puede estar vacía")
+
+        return scenario
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "Scenario":
+        """Carga un escenario desde un archivo JSON."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
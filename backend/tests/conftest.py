@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los módulos se importan como `app.*` y `loadtest.*`, igual que con `run.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
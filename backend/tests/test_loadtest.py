@@ -0,0 +1,151 @@
+"""
+Pruebas de las partes puras del generador de carga (sin servidor).
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartParser
+
+from loadtest.runner import encode_multipart, percentile, summarize
+from loadtest.scenario import RequestSpec, Scenario, ServerSpec
+
+
+def _record(latency_ms, error=None, label="a"):
+    return {"label": label, "latency_ms": latency_ms, "error": error}
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [10.0, 20.0, 30.0, 40.0]
+
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 50) == 25.0
+    assert percentile(values, 100) == 40.0
+    assert percentile(list(range(101)), 99) == 99
+
+
+def test_percentile_edge_cases():
+    assert percentile([], 50) is None
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_summarize_counts_errors_and_throughput():
+    records = [_record(10.0), _record(20.0), _record(5.0, "HTTP 500"), _record(30000.0, "timeout")]
+
+    stats = summarize(records, wall_time=2.0)
+
+    assert stats["requests"] == 4
+    assert stats["ok"] == 2
+    assert stats["errors"] == 2
+    assert stats["error_rate"] == 0.5
+    assert stats["error_kinds"] == {"HTTP 500": 1, "timeout": 1}
+    assert stats["throughput_rps"] == 1.0
+
+
+def test_summarize_keeps_failed_requests_in_tail_latency():
+    records = [_record(10.0)] * 9 + [_record(30000.0, "timeout")]
+
+    stats = summarize(records, wall_time=1.0)
+
+    assert stats["latency_ms"]["max"] == 30000.0
+    assert stats["latency_ms"]["p99"] > 10.0
+    assert stats["latency_ok_ms"]["max"] == 10.0
+    assert stats["latency_ok_ms"]["p99"] == 10.0
+
+
+def test_summarize_empty():
+    stats = summarize([], wall_time=1.0)
+
+    assert stats["requests"] == 0
+    assert stats["error_rate"] == 0.0
+    assert stats["latency_ms"]["p50"] is None
+
+
+def test_encode_multipart_round_trips_through_starlette():
+    image = b"\x89PNG\r\n--not-a-boundary\r\n"
+    body, content_type = encode_multipart(
+        {"max_width": "60", "include_metadata": "true"}, image, "image/png"
+    )
+
+    async def _stream():
+        yield body
+
+    async def _parse():
+        form = await MultiPartParser(Headers({"content-type": content_type}), _stream()).parse()
+        upload = form["image"]
+        return form["max_width"], form["include_metadata"], upload.content_type, await upload.read()
+
+    assert asyncio.run(_parse()) == ("60", "true", "image/png", image)
+
+
+def test_request_spec_defaults_and_label():
+    spec = RequestSpec.from_dict({"max_width": 60, "include_metadata": True, "image_format": "jpeg"})
+
+    assert spec.image_size == (640, 480)
+    assert spec.image_format == "JPEG"
+    assert spec.label == "convert w=60 640x480 JPEG +meta"
+
+
+@pytest.mark.parametrize("data", [
+    {"endpoint": "profiles"},
+    {"weight": 0},
+    {"include_metadata": "false"},
+    {"include_metadata": 0},
+    {"image_size": "ab"},
+    {"image_size": [640]},
+    {"image_size": [1.5, 2]},
+    {"image_size": [True, 2]},
+    {"image_size": [0, 480]},
+    {"image_format": "TIFF"},
+])
+def test_request_spec_rejects_invalid(data):
+    with pytest.raises(ValueError):
+        RequestSpec.from_dict(data)
+
+
+@pytest.mark.parametrize("data", [
+    {"mode": "docker"},
+    {"mode": "url"},
+    {"workers": 0},
+    {"mode": "inprocess", "workers": 2},
+    {"settings": {"no_existe": 1}},
+    {"settings": {"max_max_width": "abc"}},
+    {"pid": "abc"},
+])
+def test_server_spec_rejects_invalid(data):
+    with pytest.raises(ValueError):
+        ServerSpec.from_dict(data)
+
+
+def test_server_spec_coerces_settings_and_pid():
+    spec = ServerSpec.from_dict({
+        "mode": "inprocess",
+        "pid": "1234",
+        "settings": {"max_max_width": "300", "enable_metadata": "false"},
+    })
+
+    assert spec.pid == 1234
+    assert spec.settings == {"max_max_width": 300, "enable_metadata": False}
+
+
+def test_server_spec_warns_on_ignored_settings_in_url_mode():
+    with pytest.warns(UserWarning):
+        ServerSpec.from_dict({"mode": "url", "url": "http://x", "settings": {"debug": True}})
+
+
+@pytest.mark.parametrize("field", ["rate", "duration", "timeout", "rss_interval"])
+@pytest.mark.parametrize("value", [0, -1, float("inf"), float("nan")])
+def test_scenario_rejects_non_positive_or_non_finite(field, value):
+    with pytest.raises(ValueError):
+        Scenario.from_dict({"name": "s", field: value})
+
+
+@pytest.mark.parametrize("name", ["baseline", "workers_4"])
+def test_shipped_scenarios_load(name):
+    path = Path(__file__).resolve().parent.parent / "loadtest" / "scenarios" / f"{name}.json"
+    scenario = Scenario.from_file(path)
+
+    assert scenario.name == name
+    assert scenario.mix